@@ -3,17 +3,99 @@ SFTP Batch Uploader — GUI
 Requires: paramiko  (pip install paramiko)
 Built-in: tkinter, threading, queue
 """
+import contextlib
+import cProfile
+import hashlib
 import json
 import os
+import pstats
 import queue
+import shlex
+import socket
+import sys
 import threading
+import time
 import tkinter as tk
+from concurrent.futures import ThreadPoolExecutor
 from tkinter import filedialog, messagebox, scrolledtext, simpledialog, ttk
 
 import paramiko
 
 
 
+# ── formatting helpers ───────────────────────────────────────────────────────
+
+def _fmt_bytes(n: float) -> str:
+    """Human-readable byte count, e.g. 1.5 GB."""
+    for unit in ("B", "KB", "MB", "GB"):
+        if n < 1024:
+            return f"{n:.0f} {unit}" if unit == "B" else f"{n:.1f} {unit}"
+        n /= 1024
+    return f"{n:.1f} TB"
+
+
+def _fmt_eta(seconds: float) -> str:
+    """Seconds → 'MMm SSs' (or 'Hh MMm' for long waits)."""
+    seconds = max(0, int(seconds))
+    hours, rem = divmod(seconds, 3600)
+    mins, secs = divmod(rem, 60)
+    if hours:
+        return f"{hours}h {mins:02d}m"
+    return f"{mins:02d}m {secs:02d}s"
+
+
+# ── tracing ──────────────────────────────────────────────────────────────────
+
+class Tracer:
+    """Collects timed spans and writes them as a Chrome-trace JSON file
+    (open in chrome://tracing or https://ui.perfetto.dev).
+    When disabled, span() is a no-op."""
+
+    def __init__(self, enabled: bool = False):
+        self.enabled  = enabled
+        self._events  = []
+        self._threads = {}              # tid → thread name
+        self._lock    = threading.Lock()
+        self._t0      = time.perf_counter()
+
+    @contextlib.contextmanager
+    def span(self, name: str, **args):
+        if not self.enabled:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._add(name, start, time.perf_counter(), args)
+
+    def _add(self, name: str, start: float, end: float, args: dict):
+        thread = threading.current_thread()
+        event  = {
+            "name": name,
+            "cat":  "upload",
+            "ph":   "X",
+            "ts":   (start - self._t0) * 1e6,     # microseconds
+            "dur":  (end - start) * 1e6,
+            "pid":  os.getpid(),
+            "tid":  thread.ident,
+        }
+        if args:
+            event["args"] = args
+        with self._lock:
+            self._events.append(event)
+            self._threads[thread.ident] = thread.name
+
+    def save(self, path: str):
+        with self._lock:
+            meta = [{"name": "thread_name", "ph": "M", "pid": os.getpid(),
+                     "tid": tid, "args": {"name": tname}}
+                    for tid, tname in self._threads.items()]
+            events = meta + list(self._events)
+        with open(path, "w", encoding="utf-8") as fh:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, fh)
+
+
 # ── upload worker (runs in a thread) ─────────────────────────────────────────
 
 class UploadWorker:
@@ -22,39 +104,391 @@ class UploadWorker:
     STOP  = "STOP"
     DONE  = "DONE"
 
+    PROGRESS_INTERVAL = 0.25   # min seconds between byte-progress events
+    MAX_STREAMS       = 10     # OpenSSH MaxStartups drops unauthenticated sessions past 10
+    MIN_MEASURE_BYTES = 1024 * 1024   # less than this is too little to record a rate
+
     def __init__(self, cfg: dict, files: list, log_q: queue.Queue,
-                 confirm_q: queue.Queue, reply_q: queue.Queue):
+                 confirm_q: queue.Queue, reply_q: queue.Queue,
+                 notify=None):
         self.cfg       = cfg
         self.files     = files
         self.log_q     = log_q
         self.confirm_q = confirm_q   # worker → GUI: request for confirmation
         self.reply_q   = reply_q     # GUI → worker: True=continue False=stop
+        self.notify    = notify      # called after each event so the GUI can wake up
         self._stop     = threading.Event()
+        self._tracer   = Tracer(bool(cfg.get("trace")))
+        # Before 3.12 cProfile only sees the thread that enabled it, so
+        # parallel-upload range threads get their own profilers, merged on
+        # save. From 3.12 the session profiler already covers every thread.
+        self._profile_ranges = bool(cfg.get("profile")) and sys.version_info < (3, 12)
+        self._range_profiles = []
+
+        # batch-wide byte accounting for progress / ETA
+        self._batch_bytes = 0        # total bytes of all existing files
+        self._batch_done  = 0        # bytes of files already finished
+        self._xfer_secs   = 0.0      # time spent transferring (delays excluded)
+        # successful uploads per mode → [bytes, secs], saved for dry runs
+        self._measured    = {"single": [0, 0.0], "parallel": [0, 0.0]}
 
     def stop(self):
         self._stop.set()
 
-    def _log(self, msg):
-        self.log_q.put(("log", msg))
+    def _emit(self, kind: str, data=None):
+        self.log_q.put((kind, data))
+        if self.notify:
+            self.notify()
 
-    def _connect(self) -> tuple:
+    def _log(self, msg):
+        self._emit("log", msg)
+
+    def _open_socket(self, timeout: float | None = None) -> socket.socket:
+        """Resolve and connect the TCP socket ourselves (rather than letting
+        paramiko do it) so DNS and connect show up as separate spans."""
+        cfg, tr = self.cfg, self._tracer
+        with tr.span("dns", host=cfg["host"]):
+            infos = socket.getaddrinfo(cfg["host"], int(cfg["port"]),
+                                       socket.AF_UNSPEC, socket.SOCK_STREAM)
+        err = None
+        with tr.span("tcp connect"):
+            for family, stype, proto, _, addr in infos:
+                sock = socket.socket(family, stype, proto)
+                sock.settimeout(timeout)
+                try:
+                    sock.connect(addr)
+                    return sock
+                except OSError as exc:
+                    err = exc
+                    sock.close()
+        raise err or OSError(f"Could not resolve {cfg['host']}")
+
+    def _connect(self, timeout: float | None = None) -> tuple:
         """Open transport + SFTP. Returns (transport, sftp)."""
-        cfg = self.cfg
-        transport = paramiko.Transport((cfg["host"], int(cfg["port"])))
-        if cfg["auth"] == "key" and cfg["key_path"]:
-            pkey = paramiko.PKey.from_private_key_file(cfg["key_path"])
-            transport.connect(username=cfg["username"], pkey=pkey)
-        else:
-            transport.connect(username=cfg["username"],
-                              password=cfg["password"])
-        sftp = paramiko.SFTPClient.from_transport(transport)
-        if sftp is None:
-            transport.close()
-            raise RuntimeError("Failed to open SFTP channel")
+        cfg, tr = self.cfg, self._tracer
+        with tr.span("connect"):
+            sock = self._open_socket(timeout)
+            try:
+                transport = paramiko.Transport(sock)
+            except Exception:
+                sock.close()
+                raise
+            try:
+                with tr.span("key exchange"):
+                    transport.start_client(timeout=timeout)
+                with tr.span("auth", method=cfg["auth"]):
+                    if cfg["auth"] == "key" and cfg["key_path"]:
+                        pkey = paramiko.PKey.from_private_key_file(cfg["key_path"])
+                        transport.auth_publickey(cfg["username"], pkey)
+                    else:
+                        transport.auth_password(cfg["username"], cfg["password"])
+                with tr.span("open sftp"):
+                    sftp = paramiko.SFTPClient.from_transport(transport)
+            except Exception:
+                transport.close()
+                raise
+            if sftp is None:
+                transport.close()
+                raise RuntimeError("Failed to open SFTP channel")
         return transport, sftp
 
+    def _put(self, sftp, local_path: str, remote_path: str, callback):
+        """Equivalent of sftp.put(..., confirm=False), split into open /
+        write / close so each phase gets its own trace span."""
+        tr   = self._tracer
+        size = os.path.getsize(local_path)
+        with tr.span("open local"):
+            fl = open(local_path, "rb")
+        with fl:
+            with tr.span("open remote"):
+                fr = sftp.open(remote_path, "wb")
+            try:
+                fr.set_pipelined(True)
+                sent = 0
+                with tr.span("write", bytes=size):
+                    while True:
+                        data = fl.read(32768)
+                        if not data:
+                            break
+                        fr.write(data)
+                        sent += len(data)
+                        callback(sent, size)
+            finally:
+                # close waits for all pipelined write acks
+                with tr.span("close remote"):
+                    fr.close()
+
+    @staticmethod
+    def _unsupported(exc: Exception) -> bool:
+        """True if an SFTP error is SSH_FX_OP_UNSUPPORTED (missing extension).
+        paramiko maps that status to a bare IOError with no errno."""
+        return (isinstance(exc, IOError) and exc.errno is None
+                and "unsupported" in str(exc).lower())
+
+    def _put_range(self, local_path: str, remote_path: str, offset: int, length: int,
+                   advance, abort: threading.Event, handshake: threading.Lock) -> bytes:
+        """Upload one byte range over its own SSH session.
+        Returns the SHA-1 of the range for verification."""
+        tr     = self._tracer
+        digest = hashlib.sha1()
+        # one handshake at a time, so the server never sees a burst of
+        # unauthenticated connections
+        with handshake:
+            if self._stop.is_set() or abort.is_set():
+                raise RuntimeError("stopped")
+            transport, sftp = self._connect()
+        try:
+            with open(local_path, "rb") as fl:
+                fl.seek(offset)
+                with tr.span("open remote"):
+                    fr = sftp.open(remote_path, "r+b")
+                try:
+                    fr.seek(offset)
+                    fr.set_pipelined(True)
+                    left = length
+                    with tr.span("write", offset=offset, bytes=length):
+                        while left:
+                            if self._stop.is_set() or abort.is_set():
+                                raise RuntimeError("stopped")
+                            data = fl.read(min(32768, left))
+                            if not data:
+                                raise RuntimeError("local file shrank during upload")
+                            fr.write(data)
+                            digest.update(data)
+                            left -= len(data)
+                            advance(len(data))
+                finally:
+                    with tr.span("close remote"):
+                        fr.close()
+        finally:
+            sftp.close()
+            transport.close()
+        return digest.digest()
+
+    def _put_chunked(self, sftp, local_path: str, remote_path: str,
+                     streams: int, callback):
+        """Split a large file into `streams` ranges written concurrently at
+        their offsets over separate sessions into `remote_path`.part, verify
+        size and hashes, then rename it into place. On failure the .part
+        file is removed. Returns how the content was verified, or None if
+        only the size could be checked."""
+        tr    = self._tracer
+        size  = os.path.getsize(local_path)
+        step  = -(-size // streams)
+        spans = [(off, min(step, size - off)) for off in range(0, size, step)]
+        part  = remote_path + ".part"
+
+        lock      = threading.Lock()
+        handshake = threading.Lock()   # serialises session setup across ranges
+        abort     = threading.Event()  # one range failed — stop the others
+        errors = []                    # first entry is the real cause
+        sent   = [0]
+        def advance(n: int):
+            with lock:
+                sent[0] += n
+                callback(sent[0], size)
+
+        def put_range(off: int, length: int) -> bytes:
+            prof = cProfile.Profile() if self._profile_ranges else None
+            if prof:
+                prof.enable()
+            try:
+                return self._put_range(local_path, part, off, length,
+                                       advance, abort, handshake)
+            except Exception as exc:
+                with lock:
+                    errors.append(exc)
+                abort.set()
+                raise
+            finally:
+                if prof:
+                    prof.disable()
+                    with lock:
+                        self._range_profiles.append(prof)
+
+        with tr.span("create remote"):
+            sftp.open(part, "wb").close()
+        try:
+            with ThreadPoolExecutor(max_workers=len(spans),
+                                    thread_name_prefix="range") as pool:
+                futures = [pool.submit(put_range, off, length) for off, length in spans]
+            if errors:
+                raise errors[0]
+            hashes = [f.result() for f in futures]
+            with tr.span("verify"):
+                method = self._verify_ranges(sftp, local_path, part, size, spans, hashes)
+            with tr.span("rename"):
+                self._replace(sftp, part, remote_path)
+        except Exception:
+            try: sftp.remove(part)
+            except Exception: pass
+            raise
+        return method
+
+    def _replace(self, sftp, src: str, dst: str):
+        """Rename src over dst. Without the posix-rename extension the old
+        dst is first moved aside and only removed once src is in place."""
+        try:
+            sftp.posix_rename(src, dst)
+            return
+        except IOError as exc:
+            if not self._unsupported(exc):
+                raise
+        backup = None
+        try:
+            sftp.stat(dst)
+            backup = dst + ".old"
+            sftp.rename(dst, backup)
+        except FileNotFoundError:
+            pass
+        try:
+            sftp.rename(src, dst)
+        except Exception:
+            if backup:
+                try: sftp.rename(backup, dst)
+                except Exception: pass
+            raise
+        if backup:
+            try: sftp.remove(backup)
+            except Exception: pass
+
+    def _verify_ranges(self, sftp, local_path: str, path: str, size: int,
+                       spans: list, hashes: list) -> str | None:
+        """Check the remote size, then the content by the first method the
+        server allows: per-range SHA-1 via check-file, whole-file sha1sum
+        over exec, or (opt-in) reading the file back. Returns the method
+        used, or None if only the size could be checked."""
+        remote_size = sftp.stat(path).st_size
+        if remote_size != size:
+            raise RuntimeError(f"size mismatch: local {size}, remote {remote_size}")
+
+        with sftp.open(path, "rb") as fr:
+            for i, ((off, length), local_hash) in enumerate(zip(spans, hashes)):
+                try:
+                    remote_hash = fr.check("sha1", off, length)
+                except IOError as exc:
+                    if i == 0 and self._unsupported(exc):
+                        break      # no check-file (e.g. OpenSSH) — try the others
+                    raise
+                if remote_hash != local_hash:
+                    raise RuntimeError(f"hash mismatch in range at offset {off}")
+            else:
+                return "check-file"
+
+        remote_sum = self._remote_sha1(sftp, path)
+        if remote_sum:
+            if remote_sum != self._local_sha1(local_path):
+                raise RuntimeError("hash mismatch (sha1sum)")
+            return "sha1sum"
+
+        if self.cfg.get("verify_readback"):
+            self._readback_verify(sftp, path, spans, hashes)
+            return "read-back"
+        return None
+
+    def _remote_sha1(self, sftp, path: str) -> str | None:
+        """Run sha1sum on the server over an exec channel.
+        Returns None if the server has no shell access or no sha1sum."""
+        try:
+            chan = sftp.get_channel().get_transport().open_session()
+        except Exception:
+            return None
+        try:
+            chan.exec_command(f"sha1sum {shlex.quote(path)}")
+            out = chan.makefile("r").read()
+            if chan.recv_exit_status() != 0:
+                return None
+        except Exception:
+            return None
+        finally:
+            chan.close()
+        if isinstance(out, bytes):
+            out = out.decode("ascii", "replace")
+        parts = out.split()
+        return parts[0].lower() if parts else None
+
+    def _local_sha1(self, local_path: str) -> str:
+        digest = hashlib.sha1()
+        with open(local_path, "rb") as fl:
+            for block in iter(lambda: fl.read(1024 * 1024), b""):
+                digest.update(block)
+        return digest.hexdigest()
+
+    def _readback_verify(self, sftp, path: str, spans: list, hashes: list):
+        """Download the remote file and compare each range's SHA-1."""
+        with sftp.open(path, "rb") as fr:
+            fr.prefetch(spans[-1][0] + spans[-1][1])
+            for (off, length), local_hash in zip(spans, hashes):
+                digest = hashlib.sha1()
+                left   = length
+                while left:
+                    if self._stop.is_set():
+                        raise RuntimeError("stopped")
+                    data = fr.read(min(32768, left))
+                    if not data:
+                        raise RuntimeError(f"short read in range at offset {off}")
+                    digest.update(data)
+                    left -= len(data)
+                if digest.digest() != local_hash:
+                    raise RuntimeError(f"hash mismatch in range at offset {off}")
+
+    def _save_trace(self, profiler):
+        """Write the session's trace (and cProfile stats) next to the app."""
+        import datetime
+        if not (self._tracer.enabled or profiler):
+            return
+        out_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "traces")
+        stamp   = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+        try:
+            os.makedirs(out_dir, exist_ok=True)
+            if self._tracer.enabled:
+                path = os.path.join(out_dir, f"sftp_trace_{stamp}.json")
+                self._tracer.save(path)
+                self._log(f"🔍 Trace written to {path}")
+            if profiler:
+                path  = os.path.join(out_dir, f"sftp_profile_{stamp}.prof")
+                stats = pstats.Stats(profiler)
+                for prof in self._range_profiles:
+                    stats.add(prof)
+                stats.dump_stats(path)
+                self._log(f"🔍 Profile written to {path}")
+        except Exception as exc:
+            self._log(f"⚠ Could not write trace: {exc}")
+
     def _timer(self, text: str):
-        self.log_q.put(("timer", text))
+        self._emit("timer", text)
+
+    def _progress_cb(self, idx: int, fname: str, remaining_delay: int):
+        """Build a paramiko transfer callback that emits throttled
+        ("progress", dict) events with per-file rate/ETA and batch ETA."""
+        started = time.monotonic()
+        last    = [0.0]
+
+        def _cb(sent: int, size: int):
+            now = time.monotonic()
+            if sent < size and now - last[0] < self.PROGRESS_INTERVAL:
+                return
+            last[0]   = now
+            elapsed   = now - started
+            rate      = sent / elapsed if elapsed > 0 else 0.0
+            # batch rate covers every byte sent so far, not just this file
+            b_sent    = self._batch_done + sent
+            b_secs    = self._xfer_secs + elapsed
+            b_rate    = b_sent / b_secs if b_secs > 0 else 0.0
+            b_left    = self._batch_bytes - b_sent
+            self._emit("progress", {
+                "idx":        idx,
+                "total":      len(self.files),
+                "fname":      fname,
+                "sent":       sent,
+                "size":       size,
+                "rate":       rate,
+                "eta":        (size - sent) / rate if rate else None,
+                "batch_sent": b_sent,
+                "batch_size": self._batch_bytes,
+                "batch_eta":  (b_left / b_rate + remaining_delay) if b_rate else None,
+            })
+        return _cb
 
     def _sleep(self, seconds: int, timer_prefix: str = "", total: int = 0) -> bool:
         """Sleep second-by-second; returns False if stopped early.
@@ -73,7 +507,33 @@ class UploadWorker:
         return True
 
     def run(self):
+        profiler = cProfile.Profile() if self.cfg.get("profile") else None
+        ok = False
+        try:
+            if profiler:
+                # < 3.12: this thread only (range threads are added on save);
+                # 3.12+: every thread, including the Tk main thread
+                try:
+                    profiler.enable()
+                except ValueError as exc:
+                    # 3.12+: another profiler / monitoring tool is active
+                    self._log(f"⚠ cProfile unavailable: {exc}")
+                    profiler = None
+            with self._tracer.span("session", files=len(self.files)):
+                ok = self._run()
+        finally:
+            if profiler:
+                profiler.disable()
+            self._save_trace(profiler)
+            rates = {m: b / secs for m, (b, secs) in self._measured.items()
+                     if b >= self.MIN_MEASURE_BYTES and secs > 0}
+            if rates:
+                self._emit("throughput", rates)
+            self._emit("done", ok)
+
+    def _run(self) -> bool:
         import datetime
+        tr    = self._tracer
         cfg   = self.cfg
         files = self.files
 
@@ -83,28 +543,33 @@ class UploadWorker:
             eta = datetime.datetime.now() + datetime.timedelta(seconds=start_delay)
             self._log(f"⏳ Upload scheduled to start at {eta.strftime('%H:%M:%S')} "
                       f"({cfg['start_delay_min']} min). Keep this computer on and connected!")
-            if not self._sleep(start_delay, "⏳ Starting in"):
+            with tr.span("start delay"):
+                completed = self._sleep(start_delay, "⏳ Starting in")
+            if not completed:
                 self._log("⛔ Stopped during initial delay.")
-                self.log_q.put(("done", False))
-                return
+                return False
             self._timer("")
 
         # ── connect ───────────────────────────────────────────────────────
         try:
             self._log(f"Connecting to {cfg['host']}:{cfg['port']} …")
             transport, sftp = self._connect()
-            home = sftp.normalize(".")
+            with tr.span("normalize"):
+                home = sftp.normalize(".")
             self._log(f"Connected ✓  (remote home: {home})")
         except Exception as exc:
             self._log(f"❌ Connection failed: {exc}")
-            self.log_q.put(("done", False))
-            return
+            return False
 
         remote_dir        = cfg["remote_dir"].rstrip("/")
         delay             = int(cfg["delay"])  if cfg["use_delay"] else 0
         test_count        = int(cfg["test_n"]) if cfg["use_test"]  else 0
         total             = len(files)
         RECONNECT_THRESH  = 55   # reconnect proactively if delay >= this many seconds
+        chunk_thresh      = (int(cfg["chunk_threshold_mb"]) * 1024 * 1024
+                             if cfg.get("use_chunked") else 0)
+        chunk_streams     = min(int(cfg.get("chunk_streams", 1)), self.MAX_STREAMS)
+        self._batch_bytes = sum(self._stat_files().values())
 
         try:
             for idx, fpath in enumerate(files, 1):
@@ -128,18 +593,45 @@ class UploadWorker:
                             self._log(f"   ❌ Reconnect failed: {exc}")
                             break
 
-                    self._log(f"[{idx:02d}/{total}] Uploading {fname} → {remote_path} …")
+                    started = time.monotonic()
+                    size    = 0
                     try:
-                        sftp.put(fpath, remote_path, confirm=False)
-                        self._log(f"[{idx:02d}/{total}] ✓ done")
+                        size    = os.path.getsize(fpath)
+                        chunked = chunk_thresh and size >= chunk_thresh and chunk_streams > 1
+                        mode    = f" ({chunk_streams} parallel streams)" if chunked else ""
+                        self._log(f"[{idx:02d}/{total}] Uploading {fname} → {remote_path}{mode} …")
+                        cb      = self._progress_cb(idx, fname, delay * (total - idx))
+                        with tr.span(f"upload {fname}", bytes=size):
+                            if chunked:
+                                method = self._put_chunked(sftp, fpath, remote_path,
+                                                           chunk_streams, cb)
+                            else:
+                                self._put(sftp, fpath, remote_path, cb)
+                        measured     = self._measured["parallel" if chunked else "single"]
+                        measured[0] += size
+                        measured[1] += time.monotonic() - started
+                        if chunked and method:
+                            self._log(f"[{idx:02d}/{total}] ✓ done (verified: size + hash via {method})")
+                        elif chunked:
+                            self._log(f"[{idx:02d}/{total}] ⚠ done — size verified, content NOT "
+                                      "checked (no check-file or sha1sum on server; "
+                                      "enable read-back in Options)")
+                        else:
+                            self._log(f"[{idx:02d}/{total}] ✓ done")
                     except Exception as exc:
                         self._log(f"[{idx:02d}/{total}] ❌ Error: {exc}")
+                    # count the file as finished either way so batch ETA keeps moving
+                    self._batch_done += size
+                    self._xfer_secs  += time.monotonic() - started
 
                 # ── test-batch pause ──────────────────────────────────────
                 if test_count and idx == test_count:
                     self._log(f"\n── Test batch done ({test_count} files) ──")
                     self.confirm_q.put("confirm")
-                    answer = self.reply_q.get()
+                    if self.notify:
+                        self.notify()
+                    with tr.span("test batch pause"):
+                        answer = self.reply_q.get()
                     if not answer:
                         self._log("Stopped after test batch.")
                         break
@@ -147,7 +639,9 @@ class UploadWorker:
 
                 # ── inter-file delay ───────────────────────────────────────
                 if delay and idx < total and not self._stop.is_set():
-                    if not self._sleep(delay, "⏱  Next upload in", idx + 1):
+                    with tr.span("delay"):
+                        completed = self._sleep(delay, "⏱  Next upload in", idx + 1)
+                    if not completed:
                         break
                     self._timer("")
                     # proactively reconnect if delay was long enough to drop the session
@@ -165,12 +659,177 @@ class UploadWorker:
             except Exception: pass
             try: transport.close()
             except Exception: pass
-            self.log_q.put(("done", True))
+        return True
+
+    # ── dry run ───────────────────────────────────────────────────────────────
+
+    DEFAULT_CONNECT_SECS  = 2.0    # assumed connect + auth time without a probe
+    DEFAULT_PER_FILE_SECS = 0.5    # assumed open/close overhead without a probe
+    PROBE_TIMEOUT         = 15     # seconds before an unreachable host gives up
+
+    def _stat_files(self) -> dict:
+        """Stat all files with one directory scan per folder.
+        Returns {path: size}; missing files are left out."""
+        by_dir = {}
+        for fpath in self.files:
+            folder = os.path.dirname(fpath) or "."
+            by_dir.setdefault(folder, {})[os.path.basename(fpath)] = fpath
+        sizes = {}
+        for folder, wanted in by_dir.items():
+            try:
+                with os.scandir(folder) as it:
+                    for entry in it:
+                        if entry.name in wanted and entry.is_file():
+                            sizes[wanted[entry.name]] = entry.stat().st_size
+            except OSError:
+                pass
+        return sizes
+
+    def _probe(self) -> dict:
+        """Connect once, list the remote dir and time a few round trips."""
+        remote_dir = self.cfg["remote_dir"].rstrip("/") or "."
+        started    = time.monotonic()
+        transport, sftp = self._connect(timeout=self.PROBE_TIMEOUT)
+        try:
+            connect_secs = time.monotonic() - started
+            sftp.get_channel().settimeout(self.PROBE_TIMEOUT)
+            remote = {a.filename: a.st_size for a in sftp.listdir_attr(remote_dir)}
+            rtts = []
+            for _ in range(3):
+                t0 = time.monotonic()
+                sftp.stat(remote_dir)
+                rtts.append(time.monotonic() - t0)
+        finally:
+            sftp.close()
+            transport.close()
+        return {"connect": connect_secs, "rtt": sorted(rtts)[1], "remote": remote}
+
+    def plan(self):
+        """Dry run: predict the batch timeline without uploading anything."""
+        import datetime
+        cfg = self.cfg
+        ok  = False
+        try:
+            self._log("🧮 Dry run — nothing will be uploaded.")
+            sizes = self._stat_files()
+
+            probe = None
+            if cfg.get("plan_probe") and not self._stop.is_set():
+                self._log(f"Probing {cfg['host']}:{cfg['port']} …")
+                try:
+                    probe = self._probe()
+                except Exception as exc:
+                    self._log(f"⚠ Probe failed, using assumptions: {exc}")
+            if self._stop.is_set():
+                self._log("⛔ Dry run stopped.")
+                return
+
+            # measured rates already include each file's open/close time,
+            # so files using one get no separate per-file overhead below
+            measured = cfg.get("measured") or {}
+            streams  = min(int(cfg.get("chunk_streams", 1)), self.MAX_STREAMS)
+            rate_measured = bool(measured.get("single"))
+            if rate_measured:
+                rate, rate_src = float(measured["single"]), "measured earlier, incl. open/close"
+            else:
+                rate, rate_src = float(cfg["plan_rate_mbps"]) * 1024 * 1024, "assumed"
+            p_measured = bool(measured.get("parallel"))
+            if p_measured:
+                # already the combined rate of all streams
+                p_rate, p_src = float(measured["parallel"]), "measured earlier, incl. open/close"
+            else:
+                # optimistic: assumes the link, not one channel, is the limit
+                p_rate, p_src = rate * streams, f"{streams} × single stream, optimistic"
+            if probe:
+                # open + close each cost about one round trip
+                connect  = probe["connect"]
+                per_file = 2 * probe["rtt"]
+                over_src = f"probed, RTT {probe['rtt'] * 1000:.0f} ms"
+            else:
+                connect, per_file, over_src = (self.DEFAULT_CONNECT_SECS,
+                                               self.DEFAULT_PER_FILE_SECS, "assumed")
+            self._log(f"   Throughput:        {_fmt_bytes(rate)}/s ({rate_src})")
+            if cfg.get("use_chunked"):
+                self._log(f"   Parallel upload:   {_fmt_bytes(p_rate)}/s ({p_src})")
+            if rate_measured and (p_measured or not cfg.get("use_chunked")):
+                over_src += "; not added — included in measured rates"
+            self._log(f"   Per-file overhead: {per_file:.2f} s ({over_src})")
+
+            # mirror the timing rules of _run()
+            delay        = int(cfg["delay"])  if cfg["use_delay"] else 0
+            test_count   = int(cfg["test_n"]) if cfg["use_test"]  else 0
+            chunk_thresh = (int(cfg["chunk_threshold_mb"]) * 1024 * 1024
+                            if cfg.get("use_chunked") else 0)
+            total        = len(self.files)
+            remote_dir   = cfg["remote_dir"].rstrip("/")
+
+            now = datetime.datetime.now()
+            def at(secs: float) -> str:
+                return (now + datetime.timedelta(seconds=secs)).strftime("%H:%M:%S")
+
+            t_delays  = int(cfg.get("start_delay_min", 0)) * 60
+            t_bytes   = 0.0
+            t_over    = connect
+            n_xfer    = 0
+            n_bytes   = 0
+            n_same    = 0
+
+            self._log("")
+            self._log(f"   {at(0)}  dry run")
+            if t_delays:
+                self._log(f"   {at(t_delays)}  start delay over ({_fmt_eta(t_delays)})")
+            for idx, fpath in enumerate(self.files, 1):
+                fname = os.path.basename(fpath)
+                t     = t_delays + t_bytes + t_over
+                if fpath not in sizes:
+                    self._log(f"   {at(t)}  [{idx:02d}/{total}] ⚠ SKIP (not found): {fname}")
+                else:
+                    size     = sizes[fpath]
+                    chunked  = chunk_thresh and size >= chunk_thresh and streams > 1
+                    secs     = size / (p_rate if chunked else rate)
+                    t_bytes += secs
+                    if not (p_measured if chunked else rate_measured):
+                        t_over += per_file
+                    n_xfer  += 1
+                    n_bytes += size
+                    note = f", {streams} streams" if chunked else ""
+                    if probe and probe["remote"].get(fname) == size:
+                        n_same += 1
+                        note += ", same size already on server"
+                    self._log(f"   {at(t)}  [{idx:02d}/{total}] {fname}  "
+                              f"{_fmt_bytes(size)}  ~{_fmt_eta(secs)}{note}")
+                if test_count and idx == test_count:
+                    self._log(f"   {at(t_delays + t_bytes + t_over)}  "
+                              "── test batch pause (waits for your confirmation) ──")
+                if delay and idx < total:
+                    t_delays += delay
+
+            t_total = t_delays + t_bytes + t_over
+            costs   = {"delays": t_delays, "bytes": t_bytes, "per-file overhead": t_over}
+            self._log(f"   {at(t_total)}  finish")
+            self._log("")
+            self._log(f"Summary: {n_xfer} transfer{'s' if n_xfer != 1 else ''}, "
+                      f"{_fmt_bytes(n_bytes)} → finish ~{at(t_total)} "
+                      f"(in {_fmt_eta(t_total)})")
+            self._log("   " + "  │  ".join(
+                f"{name} {_fmt_eta(secs)} ({secs / t_total:.0%})" if t_total else f"{name} 0s"
+                for name, secs in costs.items()))
+            self._log(f"   Dominant cost: {max(costs, key=costs.get)}")
+            if n_same:
+                self._log(f"   {n_same} file(s) already on "
+                          f"{remote_dir or 'the remote'} with the same size (will be overwritten)")
+            ok = True
+        except Exception as exc:
+            self._log(f"❌ Dry run failed: {exc}")
+        finally:
+            self._emit("done", ok)
 
 
 # ── main GUI ──────────────────────────────────────────────────────────────────
 
 class App(tk.Tk):
+    COALESCE_MS = 100   # batch worker events into one UI update per this interval
+
     def __init__(self):
         super().__init__()
         self.title("SFTP Batch Uploader")
@@ -182,9 +841,10 @@ class App(tk.Tk):
         self._log_q    = queue.Queue()
         self._confirm_q = queue.Queue()
         self._reply_q  = queue.Queue()
+        self._wake_pending  = threading.Event()   # a drain is already scheduled
+        self._dry           = False               # current worker is a dry run
 
         self._build_ui()
-        self._poll()
 
     # ── UI construction ───────────────────────────────────────────────────────
 
@@ -548,6 +1208,55 @@ class App(tk.Tk):
         self._start_delay_lbl.pack(side="left", padx=(8, 0))
         self.v_start_delay.trace_add("write", lambda *_: self._update_start_delay_lbl())
 
+        # Diagnostics
+        ttk.Separator(f, orient="horizontal").grid(row=4, column=0, columnspan=2,
+                                                   sticky="ew", pady=10)
+        self.v_trace   = tk.BooleanVar(value=False)
+        self.v_profile = tk.BooleanVar(value=False)
+        ttk.Checkbutton(f, text="Write trace file (Chrome / Perfetto JSON)",
+                        variable=self.v_trace).grid(row=5, column=0, sticky="w", pady=6)
+        ttk.Checkbutton(f, text="Include cProfile of upload thread",
+                        variable=self.v_profile).grid(row=6, column=0, sticky="w", pady=6)
+
+        # Parallel chunked upload
+        ttk.Separator(f, orient="horizontal").grid(row=7, column=0, columnspan=2,
+                                                   sticky="ew", pady=10)
+        self.v_use_chunked  = tk.BooleanVar(value=False)
+        self.v_chunk_thresh = tk.StringVar(value="1024")
+        self.v_chunk_n      = tk.StringVar(value="4")
+        ttk.Checkbutton(f, text="Parallel upload for files over (MB):",
+                        variable=self.v_use_chunked,
+                        command=self._toggle_chunked).grid(row=8, column=0, sticky="w", pady=6)
+        ch_f = ttk.Frame(f)
+        ch_f.grid(row=8, column=1, sticky="w", padx=8)
+        self._chunk_thresh_spin = ttk.Spinbox(ch_f, from_=1, to=1048576,
+                                              textvariable=self.v_chunk_thresh,
+                                              width=8, state="disabled")
+        self._chunk_thresh_spin.pack(side="left")
+        ttk.Label(ch_f, text="streams:").pack(side="left", padx=(8, 4))
+        self._chunk_n_spin = ttk.Spinbox(ch_f, from_=2, to=UploadWorker.MAX_STREAMS,
+                                         textvariable=self.v_chunk_n,
+                                         width=4, state="disabled")
+        self._chunk_n_spin.pack(side="left")
+        self.v_readback = tk.BooleanVar(value=False)
+        self._readback_chk = ttk.Checkbutton(
+            f, text="Verify by reading back if the server can't hash (downloads the file again)",
+            variable=self.v_readback, state="disabled")
+        self._readback_chk.grid(row=9, column=0, columnspan=2, sticky="w", pady=6)
+
+        # Dry run
+        ttk.Separator(f, orient="horizontal").grid(row=10, column=0, columnspan=2,
+                                                   sticky="ew", pady=10)
+        self.v_plan_rate  = tk.StringVar(value="5")
+        self.v_plan_probe = tk.BooleanVar(value=False)
+        ttk.Label(f, text="Dry run — assumed throughput (MB/s):").grid(row=11, column=0,
+                                                                      sticky="w", pady=6)
+        ttk.Spinbox(f, from_=0.1, to=10000, increment=0.5, textvariable=self.v_plan_rate,
+                    width=8).grid(row=11, column=1, sticky="w", padx=8)
+        ttk.Checkbutton(f, text="Dry run — probe remote (existing files, round-trip time)",
+                        variable=self.v_plan_probe).grid(row=12, column=0, columnspan=2,
+                                                         sticky="w", pady=6)
+
     def _toggle_delay(self):
         s = "normal" if self.v_use_delay.get() else "disabled"
         self._delay_spin.config(state=s)
@@ -561,6 +1270,12 @@ class App(tk.Tk):
         self._start_delay_spin.config(state=s)
         self._update_start_delay_lbl()
 
+    def _toggle_chunked(self):
+        s = "normal" if self.v_use_chunked.get() else "disabled"
+        self._chunk_thresh_spin.config(state=s)
+        self._chunk_n_spin.config(state=s)
+        self._readback_chk.config(state=s)
+
     def _update_start_delay_lbl(self):
         import datetime
         if not self.v_use_start_delay.get():
@@ -590,6 +1305,19 @@ class App(tk.Tk):
                                    font=("Consolas", 10, "bold"), anchor="w", padx=8)
         self._timer_lbl.pack(fill="both", expand=True)
 
+        # ── byte progress (current file + batch) ──────────────────────────
+        prog_f = ttk.Frame(self)
+        prog_f.pack(fill="x", padx=8, pady=(0, 2))
+        prog_f.columnconfigure(1, weight=1)
+        ttk.Label(prog_f, text="File:").grid(row=0, column=0, sticky="w", padx=(0, 6))
+        self._file_bar = ttk.Progressbar(prog_f, maximum=1.0)
+        self._file_bar.grid(row=0, column=1, sticky="ew")
+        ttk.Label(prog_f, text="Batch:").grid(row=1, column=0, sticky="w", padx=(0, 6))
+        self._batch_bar = ttk.Progressbar(prog_f, maximum=1.0)
+        self._batch_bar.grid(row=1, column=1, sticky="ew", pady=(2, 0))
+        self._progress_lbl = ttk.Label(prog_f, text="", font=("Consolas", 9))
+        self._progress_lbl.grid(row=2, column=0, columnspan=2, sticky="w")
+
         frame = ttk.LabelFrame(self, text=" Log ", padding=6)
         frame.pack(fill="both", expand=True, padx=8, pady=(0,8))
         frame.columnconfigure(0, weight=1)
@@ -607,6 +1335,10 @@ class App(tk.Tk):
                                      command=self._start, style="Accent.TButton")
         self._start_btn.pack(side="left")
 
+        self._plan_btn = ttk.Button(btn_f, text="🧮  Dry run",
+                                    command=self._dry_run)
+        self._plan_btn.pack(side="left", padx=(8, 0))
+
         self._stop_btn = ttk.Button(btn_f, text="⏹  Stop",
                                     command=self._stop, state="disabled")
         self._stop_btn.pack(side="left", padx=8)
@@ -630,6 +1362,14 @@ class App(tk.Tk):
             "use_test":        self.v_use_test.get(),
             "test_n":          self.v_test_n.get() or "1",
             "start_delay_min": self.v_start_delay.get() if self.v_use_start_delay.get() else "0",
+            "trace":           self.v_trace.get(),
+            "profile":         self.v_profile.get(),
+            "use_chunked":     self.v_use_chunked.get(),
+            "chunk_threshold_mb": self.v_chunk_thresh.get() or "1024",
+            "chunk_streams":   self.v_chunk_n.get() or "4",
+            "verify_readback": self.v_readback.get(),
+            "plan_rate_mbps":  self.v_plan_rate.get() or "5",
+            "plan_probe":      self.v_plan_probe.get(),
         }
 
     def _start(self):
@@ -658,6 +1398,33 @@ class App(tk.Tk):
             if not ok:
                 return
 
+        self._launch(cfg, files, dry_run=False)
+
+    def _dry_run(self):
+        files = list(self._file_list.get(0, "end"))
+        if not files:
+            messagebox.showwarning("No files", "Please add files to plan first.")
+            return
+
+        cfg = self._get_cfg()
+        if cfg["plan_probe"] and (not cfg["host"] or not cfg["username"]):
+            messagebox.showwarning("Missing info",
+                                   "Host and username are required to probe the remote.")
+            return
+        try:
+            rate_ok = float(cfg["plan_rate_mbps"]) > 0
+        except ValueError:
+            rate_ok = False
+        if not rate_ok:
+            messagebox.showwarning("Invalid throughput",
+                                   "Assumed throughput must be a number greater than 0.")
+            return
+        cfg["measured"] = ((self._load_throughput() or {})
+                           .get(f"{cfg['host']}:{cfg['port']}", {}))
+        self._launch(cfg, files, dry_run=True)
+
+    def _launch(self, cfg: dict, files: list, dry_run: bool):
+        """Start a worker thread for an upload or a dry run."""
         # clear queues
         for q in (self._log_q, self._confirm_q, self._reply_q):
             while not q.empty():
@@ -668,12 +1435,18 @@ class App(tk.Tk):
         self._confirm_q = queue.Queue()
         self._reply_q   = queue.Queue()
 
+        self._wake_pending.clear()
+        self._set_progress(None)
         self._worker = UploadWorker(cfg, files, self._log_q,
-                                    self._confirm_q, self._reply_q)
-        self._thread = threading.Thread(target=self._worker.run, daemon=True)
+                                    self._confirm_q, self._reply_q,
+                                    notify=self._notify)
+        self._dry           = dry_run
+        target = self._worker.plan if dry_run else self._worker.run
+        self._thread = threading.Thread(target=target, daemon=True)
         self._thread.start()
 
         self._start_btn.config(state="disabled")
+        self._plan_btn.config(state="disabled")
         self._stop_btn.config(state="normal")
 
     def _stop(self):
@@ -683,11 +1456,27 @@ class App(tk.Tk):
             try: self._reply_q.put_nowait(False)
             except: pass
 
-    # ── polling ───────────────────────────────────────────────────────────────
+    # ── worker events ─────────────────────────────────────────────────────────
+
+    def _notify(self):
+        """Called from the worker thread after it queues an event.
+        Schedules at most one drain per COALESCE_MS, so the UI sleeps while
+        idle and a busy batch cannot flood the Tk event loop."""
+        if self._wake_pending.is_set():
+            return
+        self._wake_pending.set()
+        try:
+            self.after(self.COALESCE_MS, self._drain)
+        except (RuntimeError, tk.TclError):
+            pass   # window already closed
+
+    def _drain(self):
+        # clear first: events queued while draining schedule a fresh wake-up
+        self._wake_pending.clear()
 
-    def _poll(self):
-        # drain log queue — keep only last timer event, show all log/done
+        # drain log queue — keep only last timer/progress event, show all log/done
         timer_text = None
+        progress   = None
         try:
             while True:
                 kind, data = self._log_q.get_nowait()
@@ -695,24 +1484,84 @@ class App(tk.Tk):
                     self._log(data)
                 elif kind == "timer":
                     timer_text = data          # only last one matters
+                elif kind == "progress":
+                    progress = data            # only last one matters
+                elif kind == "throughput":
+                    self._record_throughput(data)
                 elif kind == "done":
                     self._timer_lbl.config(text="")
                     self._start_btn.config(state="normal")
+                    self._plan_btn.config(state="normal")
                     self._stop_btn.config(state="disabled")
-                    self._log("\n─── Upload session ended ───\n")
+                    self._set_progress(None)
+                    progress = None            # don't refill bars from this drain
+                    if self._dry:
+                        self._log("\n─── Dry run ended ───\n")
+                    else:
+                        self._log("\n─── Upload session ended ───\n")
         except queue.Empty:
             pass
         if timer_text is not None:
             self._timer_lbl.config(text=timer_text)
+        if progress is not None:
+            self._set_progress(progress)
 
         # check for confirmation request from worker
         try:
-            self._confirm_q.get_nowait()   # blocks? no — nowait
+            self._confirm_q.get_nowait()
             self._ask_continue()
         except queue.Empty:
             pass
 
-        self.after(150, self._poll)
+    def _throughput_path(self) -> str:
+        return os.path.join(os.path.dirname(os.path.abspath(__file__)), "sftp_throughput.json")
+
+    def _load_throughput(self) -> dict | None:
+        """Measured rates per host:port. {} if none yet, None if unreadable."""
+        p = self._throughput_path()
+        if not os.path.exists(p):
+            return {}
+        try:
+            with open(p, "r", encoding="utf-8") as fh:
+                return json.load(fh)
+        except Exception:
+            return None
+
+    def _record_throughput(self, rates: dict):
+        """Remember the measured single-stream / parallel rates (bytes/s)
+        for this host:port, for future dry runs. Kept apart from the
+        presets file so this background write can never touch presets."""
+        data = self._load_throughput()
+        if data is None:
+            return   # unreadable right now — don't overwrite it
+        cfg = self._worker.cfg
+        key = f"{cfg['host']}:{cfg['port']}"
+        data[key] = {**data.get(key, {}), **{m: round(r) for m, r in rates.items()}}
+        path = self._throughput_path()
+        try:
+            with open(path + ".tmp", "w", encoding="utf-8") as fh:
+                json.dump(data, fh, indent=2)
+            os.replace(path + ".tmp", path)
+        except OSError:
+            pass
+
+    def _set_progress(self, p: dict | None):
+        if not p:
+            self._file_bar["value"]  = 0
+            self._batch_bar["value"] = 0
+            self._progress_lbl.config(text="")
+            return
+        self._file_bar["value"]  = p["sent"] / p["size"] if p["size"] else 1.0
+        self._batch_bar["value"] = (p["batch_sent"] / p["batch_size"]
+                                    if p["batch_size"] else 1.0)
+        eta   = _fmt_eta(p["eta"]) if p["eta"] is not None else "--"
+        b_eta = _fmt_eta(p["batch_eta"]) if p["batch_eta"] is not None else "--"
+        self._progress_lbl.config(text=(
+            f"[{p['idx']:02d}/{p['total']}] {p['fname']}  "
+            f"{_fmt_bytes(p['sent'])}/{_fmt_bytes(p['size'])}  "
+            f"{_fmt_bytes(p['rate'])}/s  ETA {eta}   │   "
+            f"batch {_fmt_bytes(p['batch_sent'])}/{_fmt_bytes(p['batch_size'])}  "
+            f"ETA {b_eta}"))
 
     def _ask_continue(self):
         answer = messagebox.askyesno(